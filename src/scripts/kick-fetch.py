@@ -5,12 +5,22 @@ Now supports quality selection by parsing HLS master playlists.
 """
 
 import sys
+import os
 import json
+import time
+import socket
+import hashlib
+import asyncio
 import urllib.parse
 import re
+import threading
+from datetime import datetime, timedelta
+from concurrent.futures import ThreadPoolExecutor, as_completed
 
 try:
+    import requests
     from cloudscraper import create_scraper
+    from requests.adapters import HTTPAdapter
 except ImportError:
     print(json.dumps({
         "success": False,
@@ -18,9 +28,261 @@ except ImportError:
     }))
     sys.exit(1)
 
+# aiohttp is optional - when available the VOD probes run on asyncio,
+# otherwise they fall back to the thread pool
+try:
+    import aiohttp
+except ImportError:
+    aiohttp = None
+
+# orjson is optional - stdlib json is used without it
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+def _loads(data):
+    """Parse JSON from str/bytes with orjson when available."""
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def _dumps(obj):
+    """Serialize obj to a JSON string with orjson when available."""
+    if orjson is not None:
+        return orjson.dumps(obj).decode()
+    return json.dumps(obj)
+
 # Enable debug mode with --debug flag
 DEBUG = '--debug' in sys.argv
 
+# Hot regexes, compiled once at module load. The STREAM-INF attributes the
+# script cares about are matched in a single alternation with named groups,
+# so one finditer pass yields already-typed values and quoted CODECS values
+# with embedded commas are matched as a unit.
+_STREAM_INF_RE = re.compile(
+    r'BANDWIDTH=(?P<bandwidth>\d+)'
+    r'|RESOLUTION=(?P<width>\d+)x(?P<height>\d+)'
+    r'|FRAME-RATE=(?P<fps>[\d.]+)'
+    r'|CODECS="(?P<codecs>[^"]*)"'
+)
+_QUALITY_RE = re.compile(r'(\d+)p(\d+)')
+
+# Extracts channel_id and video_id from a VOD thumbnail URL of the shape
+# scheme://host/<prefix>/<channel_id>/<video_id>/..., anchored on the same
+# path positions the old split('/')[4]/[5] indexing read
+_THUMBNAIL_RE = re.compile(r'^[a-z]+://[^/]+/[^/]+/([^/]+)/([^/]+)(?:/|$)')
+
+# Matches a #EXT-X-STREAM-INF tag together with the URI line that follows it
+# (blank lines in between tolerated), so the whole playlist is scanned in a
+# single finditer pass
+_VARIANT_RE = re.compile(r'^#EXT-X-STREAM-INF:([^\n]*)\n+([^#\n][^\n]*)', re.M)
+
+
+def _parse_stream_inf(attrs):
+    """Parse one #EXT-X-STREAM-INF attribute list into a typed stream dict."""
+    stream = {}
+    for match in _STREAM_INF_RE.finditer(attrs):
+        group = match.lastgroup
+        if group == 'bandwidth':
+            stream['BANDWIDTH'] = int(match.group('bandwidth'))
+        elif group == 'height':
+            stream['width'] = int(match.group('width'))
+            stream['height'] = int(match.group('height'))
+        elif group == 'fps':
+            stream['FRAME-RATE'] = float(match.group('fps'))
+        elif group == 'codecs':
+            stream['CODECS'] = match.group('codecs')
+    return stream
+
+# On-disk TTL cache for API responses, shared across CLI invocations
+_CACHE_DIR = os.path.join(
+    os.environ.get('XDG_CACHE_HOME', os.path.join(os.path.expanduser('~'), '.cache')),
+    'streambot', 'kick'
+)
+
+# Browser fingerprint and generic headers used for every scraper session.
+# Per-call headers (e.g. Referer) are passed on the individual requests so
+# the session stays shareable.
+_BROWSER = {
+    'browser': 'chrome',
+    'platform': 'windows',
+    'desktop': True
+}
+_BASE_HEADERS = {
+    'Accept': 'application/json',
+    'Accept-Language': 'en-US,en;q=0.9',
+    'Origin': 'https://kick.com'
+}
+
+# Shared cloudscraper session, created lazily on first use so the Cloudflare
+# JS challenge is solved once and the underlying keep-alive connections are
+# reused across all API calls and VOD probes.
+_SCRAPER = None
+
+
+# Cache key and lifetime for persisted session state. Cloudflare clearance
+# cookies are only honored together with the User-Agent that earned them,
+# so both are stored and restored as a unit.
+_SESSION_STATE_KEY = 'scraper-session'
+_SESSION_STATE_TTL = 1800
+
+
+def _restore_scraper_state(scraper):
+    """Load persisted cookies and User-Agent into a fresh scraper session."""
+    state = _cache_get(_SESSION_STATE_KEY, ttl=_SESSION_STATE_TTL)
+    if not state:
+        return
+    user_agent = state.get('user_agent')
+    if user_agent:
+        scraper.headers['User-Agent'] = user_agent
+    for cookie in state.get('cookies', []):
+        scraper.cookies.set(
+            cookie['name'], cookie['value'],
+            domain=cookie.get('domain', ''), path=cookie.get('path', '/')
+        )
+    log_debug(f"Restored {len(state.get('cookies', []))} session cookies")
+
+
+def _persist_scraper_state(scraper):
+    """Save the session cookies and User-Agent for the next CLI invocation."""
+    cookies = [
+        {'name': c.name, 'value': c.value, 'domain': c.domain, 'path': c.path}
+        for c in scraper.cookies
+    ]
+    _cache_put(_SESSION_STATE_KEY, {
+        'user_agent': scraper.headers.get('User-Agent'),
+        'cookies': cookies
+    })
+
+
+def _get_scraper():
+    """Return the shared cloudscraper session, creating it on first call."""
+    global _SCRAPER
+    if _SCRAPER is None:
+        _SCRAPER = create_scraper(browser=_BROWSER)
+        _SCRAPER.headers.update(_BASE_HEADERS)
+        # Widen the connection pool so the parallel VOD probes can keep
+        # multiple keep-alive sockets open at once
+        _SCRAPER.mount('https://', HTTPAdapter(pool_connections=16, pool_maxsize=16))
+        # Reuse Cloudflare clearance from a previous run when still fresh,
+        # skipping the JS challenge solve entirely
+        _restore_scraper_state(_SCRAPER)
+    return _SCRAPER
+
+
+# Plain requests session for the CDN probes - stream.kick.com is not behind
+# the Cloudflare JS challenge, so cloudscraper's solver is pure overhead there
+_CDN_SESSION = None
+
+
+def _get_cdn_session():
+    """Return the shared plain-requests session used for CDN probes."""
+    global _CDN_SESSION
+    if _CDN_SESSION is None:
+        _CDN_SESSION = requests.Session()
+        _CDN_SESSION.mount('https://', HTTPAdapter(pool_connections=16, pool_maxsize=16))
+    return _CDN_SESSION
+
+
+async def _probe_one_async(session, url, timeout):
+    """Probe a single candidate URL, returning it on success and None otherwise."""
+    try:
+        async with session.head(url, timeout=timeout,
+                                allow_redirects=False) as response:
+            status = response.status
+            location = response.headers.get('Location')
+        if status in (405, 501):
+            # HEAD not supported - retry with a 1-byte ranged GET
+            async with session.get(url, timeout=timeout,
+                                   headers={'Range': 'bytes=0-0'},
+                                   allow_redirects=False) as response:
+                status = response.status
+                location = response.headers.get('Location')
+        # A redirect with a Location also proves the playlist exists; the
+        # later GET follows it normally
+        if status in (200, 206) or (300 <= status < 400 and location):
+            return url
+    except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+        # Guarded so failed probes don't pay exception formatting
+        if DEBUG:
+            log_debug(f"URL test failed: {e}")
+    return None
+
+
+async def _probe_vod_master_async(candidates):
+    """
+    Probe candidate VOD master playlist URLs concurrently over aiohttp.
+
+    The CDN (stream.kick.com) is not behind the Cloudflare JS challenge, so
+    a plain aiohttp session is enough here - only the kick.com API calls
+    need cloudscraper.
+    """
+    timeout = aiohttp.ClientTimeout(total=5)
+    connector = aiohttp.TCPConnector(limit=32, ttl_dns_cache=300)
+    async with aiohttp.ClientSession(connector=connector) as session:
+        tasks = [
+            asyncio.ensure_future(_probe_one_async(session, url, timeout))
+            for url in candidates
+        ]
+        try:
+            for completed in asyncio.as_completed(tasks):
+                url = await completed
+                if url:
+                    return url
+        finally:
+            for task in tasks:
+                task.cancel()
+    return None
+
+
+def _probe_vod_master(candidates):
+    """
+    Probe candidate VOD master playlist URLs concurrently and return the
+    first one that answers 200, or None if none do.
+    """
+    if aiohttp is not None:
+        return asyncio.run(_probe_vod_master_async(candidates))
+
+    session = _get_cdn_session()
+    with ThreadPoolExecutor(max_workers=16) as executor:
+        futures = {
+            executor.submit(_probe_one, session, url): url
+            for url in candidates
+        }
+        for future in as_completed(futures):
+            try:
+                found = future.result()
+            except requests.RequestException as e:
+                # Guarded so failed probes don't pay exception formatting
+                if DEBUG:
+                    log_debug(f"URL test failed: {e}")
+                continue
+            if found:
+                executor.shutdown(wait=False, cancel_futures=True)
+                return found
+    return None
+
+
+def _probe_one(session, url):
+    """Probe a single candidate URL, returning it on success and None otherwise."""
+    response = session.head(url, timeout=5, allow_redirects=False)
+    if response.status_code in (405, 501):
+        # HEAD not supported - retry with a 1-byte ranged GET
+        response = session.get(url, timeout=5,
+                               headers={'Range': 'bytes=0-0'},
+                               allow_redirects=False, stream=True)
+        response.close()
+    # A redirect with a Location also proves the playlist exists; the later
+    # GET follows it normally
+    if response.status_code in (200, 206):
+        return url
+    if 300 <= response.status_code < 400 and response.headers.get('Location'):
+        return url
+    return None
+
 
 def log_debug(message):
     """Print debug message if debug mode is enabled."""
@@ -28,49 +290,137 @@ def log_debug(message):
         print(f"[DEBUG] {message}", file=sys.stderr)
 
 
+def log_debug_json(label, obj):
+    """Pretty-print obj for debugging, serializing only when debug is enabled."""
+    if DEBUG:
+        print(f"[DEBUG] {label}: {json.dumps(obj, indent=2)}", file=sys.stderr)
+
+
+# Memo for parsed VOD start_time values - in daemon mode the same VOD is
+# often requested repeatedly, so each ISO string is parsed only once
+_START_TIME_CACHE = {}
+
+
+def _parse_start_time(start_time):
+    """Parse an ISO-8601 start_time string, memoized per unique value."""
+    dt = _START_TIME_CACHE.get(start_time)
+    if dt is None:
+        dt = datetime.fromisoformat(start_time.replace('Z', '+00:00'))
+        _START_TIME_CACHE[start_time] = dt
+    return dt
+
+
+# Known CDN base URLs for VOD master playlists
+_VOD_BASE_URLS = [
+    'https://stream.kick.com/ivs/v1/196233775518',
+    'https://stream.kick.com/3c81249a5ce0/ivs/v1/196233775518',
+    'https://stream.kick.com/0f3cb0ebce7/ivs/v1/196233775518'
+]
+
+# Winning base URL per channel_id, remembered in-process and on disk so
+# later VODs from the same channel skip the probe fan-out
+_BASE_URL_CACHE = {}
+
+
+def _vod_master_url(base_url, channel_id, adjusted_time, video_id):
+    """Build a candidate VOD master playlist URL from its known pattern."""
+    return (
+        f"{base_url}/{channel_id}/{adjusted_time.year}/{adjusted_time.month}/"
+        f"{adjusted_time.day}/{adjusted_time.hour}/{adjusted_time.minute}/"
+        f"{video_id}/media/hls/master.m3u8"
+    )
+
+
+def _get_cached_base_url(channel_id):
+    """Return the base URL that last worked for this channel, if any."""
+    base_url = _BASE_URL_CACHE.get(channel_id)
+    if base_url is None:
+        base_url = _cache_get(f"vod-base:{channel_id}", ttl=7 * 86400)
+        if base_url:
+            _BASE_URL_CACHE[channel_id] = base_url
+    return base_url
+
+
+def _remember_base_url(channel_id, master_url):
+    """Record which base URL produced a hit for this channel."""
+    for base_url in _VOD_BASE_URLS:
+        if master_url.startswith(base_url + '/'):
+            _BASE_URL_CACHE[channel_id] = base_url
+            _cache_put(f"vod-base:{channel_id}", base_url)
+            return
+
+
+def _warm_cdn_connection():
+    """Put a keep-alive connection to the VOD CDN into the probe pool."""
+    try:
+        _get_cdn_session().head('https://stream.kick.com/', timeout=5,
+                                allow_redirects=False)
+        log_debug("Warmed CDN connection")
+    except requests.RequestException as e:
+        log_debug(f"CDN warm-up failed: {e}")
+
+
+def _prewarm_connections():
+    """
+    Warm the CDN connection pool in a daemon thread so the
+    stream.kick.com handshake overlaps the Cloudflare-challenged API
+    fetch instead of following it. The request goes through the shared
+    probe session so the pool keeps the socket open for the real probes;
+    kick.com needs no warming since the API GET is that session's first
+    traffic anyway.
+    """
+    threading.Thread(target=_warm_cdn_connection, daemon=True).start()
+
+
+def _cache_path(key):
+    return os.path.join(_CACHE_DIR, hashlib.sha1(key.encode()).hexdigest() + '.json')
+
+
+def _cache_get(key, ttl, allow_stale=False):
+    """
+    Return the cached body for key if it is younger than ttl seconds.
+    With allow_stale=True the age check is skipped, which lets callers
+    fall back to a stale entry when the network fetch fails.
+    """
+    try:
+        with open(_cache_path(key), 'rb') as f:
+            entry = _loads(f.read())
+        if allow_stale or time.time() - entry['ts'] <= ttl:
+            return entry['body']
+    except Exception:
+        pass
+    return None
+
+
+def _cache_put(key, body):
+    """Store a JSON-serializable body for key, best effort."""
+    try:
+        os.makedirs(_CACHE_DIR, exist_ok=True)
+        path = _cache_path(key)
+        tmp_path = path + '.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            f.write(_dumps({'ts': time.time(), 'body': body}))
+        os.replace(tmp_path, path)
+    except Exception as e:
+        log_debug(f"Cache write failed: {e}")
+
+
 def parse_m3u8_master_playlist(content: str) -> list:
     """
     Parse M3U8 master playlist to extract stream variants.
     Returns list of stream dictionaries with quality info.
     """
     streams = []
-    lines = content.strip().split('\n')
-    current_stream = {}
 
-    for line in lines:
-        line = line.strip()
-
-        # Skip empty lines and comments (except EXT-X-STREAM-INF)
-        if not line:
+    # One pass over the whole playlist: each match pairs a STREAM-INF tag
+    # (format: #EXT-X-STREAM-INF:BANDWIDTH=123456,RESOLUTION=1920x1080,
+    # CODECS="...",FRAME-RATE=60) with the URL line that follows it
+    for match in _VARIANT_RE.finditer(content):
+        stream = _parse_stream_inf(match.group(1))
+        if not stream:
             continue
-
-        if line.startswith('#EXT-X-STREAM-INF:'):
-            current_stream = {}
-
-            # Parse the STREAM-INF attributes
-            # Format: #EXT-X-STREAM-INF:BANDWIDTH=123456,RESOLUTION=1920x1080,CODECS="...",FRAME-RATE=60
-            ext_inf = line.replace('#EXT-X-STREAM-INF:', '').strip()
-
-            # Parse all key=value pairs
-            for match in re.finditer(r'(\w+)=([^,]+)', ext_inf):
-                key = match.group(1)
-                value = match.group(2).strip('"\'')
-                current_stream[key] = value
-
-                # Convert to appropriate types
-                if key == 'BANDWIDTH':
-                    current_stream[key] = int(value)
-                elif key == 'RESOLUTION':
-                    current_stream['width'] = int(value.split('x')[0])
-                    current_stream['height'] = int(value.split('x')[1])
-                elif key == 'FRAME-RATE':
-                    current_stream[key] = float(value)
-
-        elif not line.startswith('#') and current_stream:
-            # This is a URL line
-            current_stream['url'] = line
-            streams.append(current_stream)
-            current_stream = {}
+        stream['url'] = match.group(2).strip()
+        streams.append(stream)
 
     return streams
 
@@ -96,29 +446,126 @@ def select_stream_by_quality(streams: list, preferred_quality: str):
 
     # Parse quality string
     # Format: "1080p60" or "720p60" etc.
-    match = re.match(r'(\d+)p(\d+)', preferred_quality)
+    match = _QUALITY_RE.match(preferred_quality)
     if not match:
         return streams[0]
 
     target_height = int(match.group(1))
     target_fps = float(match.group(2))
 
-    # Find exact match
-    exact_match = None
+    # Single pass: closest height wins, ties broken toward the matching
+    # frame rate - an exact height+fps match scores (0, False) and beats
+    # everything else
+    return min(streams, key=lambda s: (
+        abs(s.get('height', 720) - target_height),
+        s.get('FRAME-RATE', 30) != target_fps
+    ))
+
+
+def _prefetch_master(scraper, referer, master_url):
+    """Fetch a remembered master playlist into the cache, for prefetching."""
+    try:
+        response = scraper.get(master_url, headers=referer, timeout=15)
+        if response.status_code == 200:
+            _cache_put(master_url, response.text)
+            log_debug(f"Prefetched master playlist: {master_url}")
+    except Exception as e:
+        log_debug(f"Master prefetch failed: {e}")
+
+
+def _finalize_from_master(scraper, referer, master_url, quality, result,
+                          ttl, vod):
+    """
+    Shared tail of the live and VOD paths: fetch (or reuse) the master
+    playlist, build the available-qualities list, select a variant and
+    resolve its URL into result.
+
+    The vod flag preserves the paths' differing fallbacks: live degrades
+    to the master URL where the VOD path constructs a quality URL or
+    reports an error.
+    """
+    # Parse the master playlist to get all available qualities. Live
+    # variant sets are stable for the duration of a broadcast and VOD
+    # playlists are immutable, so both tolerate a TTL cache.
+    m3u8_content = _cache_get(master_url, ttl=ttl)
+    if m3u8_content is None:
+        m3u8_response = scraper.get(master_url, headers=referer, timeout=15)
+        if m3u8_response.status_code != 200:
+            log_debug(f"Failed to fetch HLS playlist: {m3u8_response.status_code}")
+            if vod:
+                # Fallback to direct quality URL construction
+                result['url'] = f"{master_url.rsplit('/master.m3u8', 1)[0]}/{quality}/playlist.m3u8"
+            else:
+                result['error'] = f"Failed to fetch HLS playlist: {m3u8_response.status_code}"
+            return result
+
+        m3u8_content = m3u8_response.text
+        _cache_put(master_url, m3u8_content)
+    else:
+        log_debug(f"Master playlist cache hit: {master_url}")
+
+    streams = parse_m3u8_master_playlist(m3u8_content)
+
+    if not streams:
+        if vod:
+            log_debug("No stream variants found in HLS playlist")
+            result['error'] = "No stream variants found in HLS playlist"
+        else:
+            log_debug("No stream variants found in HLS playlist, returning master URL")
+            # Fallback to master URL if no variants found
+            result['url'] = master_url
+        return result
+
+    log_debug(f"Found {len(streams)} stream variants")
+
+    # Build available qualities list, deduped via a set. The same pass
+    # tracks the highest-bandwidth variant so the common 'auto' case needs
+    # no second scan.
+    qualities = set()
+    best_stream = None
+    best_bandwidth = -1
     for stream in streams:
-        if (stream.get('height') == target_height and
-            stream.get('FRAME-RATE', 30) == target_fps):
-            exact_match = stream
-            break
+        height = stream.get('height')
+        if height:
+            # Label each stream once; reused below for the selected stream
+            stream['quality_label'] = f"{height}p{int(stream.get('FRAME-RATE', 30))}"
+            qualities.add(stream['quality_label'])
+        bandwidth = stream.get('BANDWIDTH', 0)
+        if bandwidth > best_bandwidth:
+            best_bandwidth = bandwidth
+            best_stream = stream
+    result['available_qualities'] = sorted(qualities)
+
+    # Select stream based on quality preference
+    if quality == 'auto':
+        selected_stream = best_stream
+    else:
+        selected_stream = select_stream_by_quality(streams, quality)
+
+    if selected_stream:
+        # Construct full URL if the stream URL is relative
+        stream_url = selected_stream['url']
+        if not stream_url.startswith('http'):
+            # Handle relative URLs
+            base_url = master_url.rsplit('/', 1)[0]
+            stream_url = f"{base_url}/{stream_url}"
+
+        result['url'] = stream_url
 
-    if exact_match:
-        return exact_match
+        # Update selected quality label
+        quality_label = selected_stream.get('quality_label')
+        if quality_label:
+            result['quality'] = quality_label
 
-    # Find closest match by height
-    sorted_streams = sorted(streams,
-                           key=lambda s: abs(s.get('height', 720) - target_height))
+        log_debug(f"Selected stream: {result['quality']} - {stream_url}")
+    elif vod:
+        result['error'] = "No matching stream found"
+    else:
+        # Fallback to master URL
+        result['url'] = master_url
+        log_debug("No matching stream, returning master URL")
 
-    return sorted_streams[0]
+    return result
 
 
 def get_live_stream_url(channel_name: str, quality: str = "auto") -> dict:
@@ -140,55 +587,70 @@ def get_live_stream_url(channel_name: str, quality: str = "auto") -> dict:
     }
 
     try:
-        # Create cloudscraper session with proper browser settings
-        scraper = create_scraper(
-            browser={
-                'browser': 'chrome',
-                'platform': 'windows',
-                'desktop': True
-            }
-        )
-
-        # Add headers to mimic a real browser
-        scraper.headers.update({
-            'Accept': 'application/json',
-            'Accept-Language': 'en-US,en;q=0.9',
-            'Referer': f'https://kick.com/{channel_name}',
-            'Origin': 'https://kick.com'
-        })
-
-        # Try to get livestream data from API
+        # Reuse the shared cloudscraper session
+        scraper = _get_scraper()
+        referer = {'Referer': f'https://kick.com/{channel_name}'}
+
+        # Speculative prefetch: when a previous run remembered this
+        # channel's master URL, fetch the playlist in the background so it
+        # overlaps the API round-trip instead of following it
+        remembered = _cache_get(f"live-master:{channel_name}", ttl=300)
+        prefetch = None
+        if remembered and _cache_get(remembered, ttl=60) is None:
+            prefetch = threading.Thread(
+                target=_prefetch_master, args=(scraper, referer, remembered),
+                daemon=True
+            )
+            prefetch.start()
+
+        # Try to get livestream data from API (short TTL cache so repeated
+        # invocations for the same channel skip the Cloudflare round-trip)
         api_url = f"https://kick.com/api/v2/channels/{channel_name}/livestream"
-        log_debug(f"Fetching livestream API: {api_url}")
-
-        response = scraper.get(api_url, timeout=15)
-        log_debug(f"Response status: {response.status_code}")
-
-        if response.status_code != 200:
-            log_debug(f"Failed to get livestream from API, trying channel info...")
-            # Try alternative approach - get channel info first
-            channel_url = f"https://kick.com/api/v2/channels/{channel_name}"
-            log_debug(f"Fetching channel info: {channel_url}")
-            channel_response = scraper.get(channel_url, timeout=15)
-
-            if channel_response.status_code == 200:
-                channel_data = channel_response.json()
-                log_debug(f"Channel data: {json.dumps(channel_data, indent=2)}")
-                if channel_data and 'data' in channel_data:
-                    livestream = channel_data['data'].get('livestream')
-                    if livestream:
-                        # Check for playback_url or hls_playlist_url
-                        hls_url = livestream.get('playback_url') or livestream.get('hls_playlist_url')
-                        if hls_url:
-                            log_debug(f"Found HLS URL: {hls_url}")
-                            # For fallback, return the master URL as is
-                            result['url'] = hls_url
-                            return result
-            result['error'] = "Could not retrieve stream URL from API"
-            return result
+        data = _cache_get(api_url, ttl=10)
+
+        if data is None:
+            log_debug(f"Fetching livestream API: {api_url}")
+            try:
+                response = scraper.get(api_url, headers=referer, timeout=15)
+            except Exception as e:
+                # Network/Cloudflare failure - serve a stale entry if we have one
+                data = _cache_get(api_url, ttl=10, allow_stale=True)
+                if data is None:
+                    raise
+                log_debug(f"Fetch failed ({e}), serving stale livestream cache")
+            else:
+                log_debug(f"Response status: {response.status_code}")
+
+                if response.status_code != 200:
+                    log_debug(f"Failed to get livestream from API, trying channel info...")
+                    # Try alternative approach - get channel info first
+                    channel_url = f"https://kick.com/api/v2/channels/{channel_name}"
+                    log_debug(f"Fetching channel info: {channel_url}")
+                    channel_response = scraper.get(channel_url, headers=referer, timeout=15)
+
+                    if channel_response.status_code == 200:
+                        channel_data = _loads(channel_response.content)
+                        log_debug_json("Channel data", channel_data)
+                        if channel_data and 'data' in channel_data:
+                            livestream = channel_data['data'].get('livestream')
+                            if livestream:
+                                # Check for playback_url or hls_playlist_url
+                                hls_url = livestream.get('playback_url') or livestream.get('hls_playlist_url')
+                                if hls_url:
+                                    log_debug(f"Found HLS URL: {hls_url}")
+                                    # For fallback, return the master URL as is
+                                    result['url'] = hls_url
+                                    return result
+                    result['error'] = "Could not retrieve stream URL from API"
+                    return result
+
+                data = _loads(response.content)
+                _cache_put(api_url, data)
+                _persist_scraper_state(scraper)
+        else:
+            log_debug(f"Livestream cache hit: {api_url}")
 
-        data = response.json()
-        log_debug(f"Livestream response: {json.dumps(data, indent=2)}")
+        log_debug_json("Livestream response", data)
 
         if not data or 'data' not in data:
             log_debug("No data in response")
@@ -204,7 +666,7 @@ def get_live_stream_url(channel_name: str, quality: str = "auto") -> dict:
         master_url = livestream.get('playback_url')
         if not master_url:
             # Try the nested livestream structure (old API structure)
-            nested_livestream = data['data'].get('livestream')
+            nested_livestream = livestream.get('livestream')
             if nested_livestream:
                 master_url = nested_livestream.get('playback_url') or nested_livestream.get('hls_playlist_url')
 
@@ -215,60 +677,14 @@ def get_live_stream_url(channel_name: str, quality: str = "auto") -> dict:
 
         log_debug(f"Found master HLS URL: {master_url}")
 
-        # Parse the master playlist to get all available qualities
-        m3u8_response = scraper.get(master_url, timeout=15)
-        if m3u8_response.status_code != 200:
-            log_debug(f"Failed to fetch HLS playlist: {m3u8_response.status_code}")
-            result['error'] = f"Failed to fetch HLS playlist: {m3u8_response.status_code}"
-            return result
-
-        m3u8_content = m3u8_response.text
-        streams = parse_m3u8_master_playlist(m3u8_content)
+        # Remember the master URL for the next run's prefetch; if the
+        # speculative fetch guessed right, wait for it to land in the cache
+        _cache_put(f"live-master:{channel_name}", master_url)
+        if prefetch is not None and master_url == remembered:
+            prefetch.join(timeout=15)
 
-        if not streams:
-            log_debug("No stream variants found in HLS playlist, returning master URL")
-            # Fallback to master URL if no variants found
-            result['url'] = master_url
-            return result
-
-        log_debug(f"Found {len(streams)} stream variants")
-
-        # Build available qualities list
-        for stream in streams:
-            height = stream.get('height')
-            fps = stream.get('FRAME-RATE', 30)
-            if height:
-                quality_label = f"{height}p{int(fps)}"
-                if quality_label not in result['available_qualities']:
-                    result['available_qualities'].append(quality_label)
-        result['available_qualities'].sort()
-
-        # Select stream based on quality preference
-        selected_stream = select_stream_by_quality(streams, quality)
-
-        if selected_stream:
-            # Construct full URL if the stream URL is relative
-            stream_url = selected_stream['url']
-            if not stream_url.startswith('http'):
-                # Handle relative URLs
-                base_url = master_url.rsplit('/', 1)[0]
-                stream_url = f"{base_url}/{stream_url}"
-
-            result['url'] = stream_url
-
-            # Update selected quality label
-            height = selected_stream.get('height')
-            fps = selected_stream.get('FRAME-RATE', 30)
-            if height:
-                result['quality'] = f"{height}p{int(fps)}"
-
-            log_debug(f"Selected stream: {result['quality']} - {stream_url}")
-        else:
-            # Fallback to master URL
-            result['url'] = master_url
-            log_debug("No matching stream, returning master URL")
-
-        return result
+        return _finalize_from_master(scraper, referer, master_url, quality,
+                                     result, ttl=60, vod=False)
 
     except Exception as e:
         log_debug(f"Exception in get_live_stream_url: {e}")
@@ -296,47 +712,43 @@ def get_vod_stream_url(channel_name: str, video_slug: str, quality: str = "auto"
     }
 
     try:
-        from datetime import datetime, timedelta
-
-        # Create cloudscraper session
-        scraper = create_scraper(
-            browser={
-                'browser': 'chrome',
-                'platform': 'windows',
-                'desktop': True
-            }
-        )
-
-        # Add headers
-        scraper.headers.update({
-            'Accept': 'application/json',
-            'Accept-Language': 'en-US,en;q=0.9',
-            'Referer': f'https://kick.com/{channel_name}',
-            'Origin': 'https://kick.com'
-        })
-
-        # Get channel videos
-        api_url = f"https://kick.com/api/v2/channels/{channelName}/videos"
-        log_debug(f"Fetching videos API: {api_url}")
-        response = scraper.get(api_url, timeout=15)
-
-        if response.status_code != 200:
-            log_debug(f"Failed to get videos: status {response.status_code}")
-            result['error'] = f"Failed to get videos: {response.status_code}"
-            return result
+        # Reuse the shared cloudscraper session
+        scraper = _get_scraper()
+        referer = {'Referer': f'https://kick.com/{channel_name}'}
+
+        # Get channel videos (the list changes rarely, so a longer TTL is fine)
+        api_url = f"https://kick.com/api/v2/channels/{channel_name}/videos"
+        data = _cache_get(api_url, ttl=60)
+
+        if data is None:
+            log_debug(f"Fetching videos API: {api_url}")
+            try:
+                response = scraper.get(api_url, headers=referer, timeout=15)
+            except Exception as e:
+                data = _cache_get(api_url, ttl=60, allow_stale=True)
+                if data is None:
+                    raise
+                log_debug(f"Fetch failed ({e}), serving stale videos cache")
+            else:
+                if response.status_code != 200:
+                    log_debug(f"Failed to get videos: status {response.status_code}")
+                    result['error'] = f"Failed to get videos: {response.status_code}"
+                    return result
+
+                data = _loads(response.content)
+                _cache_put(api_url, data)
+                _persist_scraper_state(scraper)
+        else:
+            log_debug(f"Videos cache hit: {api_url}")
 
-        data = response.json()
         if not data or 'data' not in data:
             log_debug("No data in videos response")
             result['error'] = "No data in videos response"
             return result
 
-        # Find the video by slug
-        video = None
-        for v in data['data'].get('videos', []):
-            if v.get('uuid') == video_slug:
-                video = v
-                break
+        # Find the video by slug via a uuid-keyed dict
+        videos_by_uuid = {v.get('uuid'): v for v in data['data'].get('videos', [])}
+        video = videos_by_uuid.get(video_slug)
 
         if not video:
             log_debug(f"Video {video_slug} not found")
@@ -353,14 +765,13 @@ def get_vod_stream_url(channel_name: str, video_slug: str, quality: str = "auto"
             return result
 
         log_debug(f"Thumbnail URL: {thumbnail_url}")
-        thumbnail_parts = thumbnail_url.split('/')
-        if len(thumbnail_parts) < 6:
+        thumbnail_match = _THUMBNAIL_RE.match(thumbnail_url)
+        if not thumbnail_match:
             log_debug("Invalid thumbnail URL format")
             result['error'] = "Invalid thumbnail URL format"
             return result
 
-        channel_id = thumbnail_parts[4]
-        video_id = thumbnail_parts[5]
+        channel_id, video_id = thumbnail_match.groups()
 
         log_debug(f"channel_id: {channel_id}, video_id: {video_id}")
 
@@ -372,106 +783,51 @@ def get_vod_stream_url(channel_name: str, video_slug: str, quality: str = "auto"
             return result
 
         # Generate VOD stream URL using the known pattern
-        dt = datetime.fromisoformat(start_time.replace('Z', '+00:00'))
+        dt = _parse_start_time(start_time)
         log_debug(f"Start time: {dt}")
 
-        # Base URLs to try
-        base_urls = [
-            'https://stream.kick.com/ivs/v1/196233775518',
-            'https://stream.kick.com/3c81249a5ce0/ivs/v1/196233775518',
-            'https://stream.kick.com/0f3cb0ebce7/ivs/v1/196233775518'
-        ]
-
-        # Try to find the master playlist first
-        master_url = None
-
-        for offset in range(-5, 6):  # -5 to +5 minutes
-            adjusted_time = dt + timedelta(minutes=offset)
-
-            year = adjusted_time.year
-            month = adjusted_time.month
-            day = adjusted_time.day
-            hour = adjusted_time.hour
-            minute = adjusted_time.minute
-
-            for base_url in base_urls:
-                # Try master playlist URL
-                url = f"{base_url}/{channel_id}/{year}/{month}/{day}/{hour}/{minute}/{video_id}/media/hls/master.m3u8"
-
-                log_debug(f"Trying master URL (offset {offset}): {url}")
-
-                try:
-                    test_response = scraper.head(url, timeout=5)
-                    if test_response.status_code == 200:
-                        log_debug(f"SUCCESS: Found valid master playlist URL!")
-                        master_url = url
-                        break
-                except Exception as e:
-                    log_debug(f"URL test failed: {e}")
-                    continue
+        # Fast path: most recordings start on the minute-aligned start_time,
+        # so a single probe with the channel's known-good (or first) base
+        # URL usually hits without the full fan-out
+        fast_base = _get_cached_base_url(channel_id) or _VOD_BASE_URLS[0]
+        fast_url = _vod_master_url(fast_base, channel_id, dt, video_id)
+        log_debug(f"Trying minute-aligned fast path: {fast_url}")
+        master_url = _probe_vod_master([fast_url])
 
-            if master_url:
-                break
+        if not master_url:
+            # Build the remaining candidate master playlist URLs (-5 to +5
+            # minutes), then probe them concurrently and take the first hit.
+            # A seen-set keeps the list free of duplicates so no URL is
+            # probed twice. Offsets are ordered nearest-first (0, -1, 1, ...)
+            # since the recording almost always starts within a minute of
+            # start_time, so the likeliest candidates complete first and the
+            # early return fires sooner.
+            candidates = []
+            seen = {fast_url}
+            for offset in sorted(range(-5, 6), key=abs):
+                adjusted_time = dt + timedelta(minutes=offset)
+
+                for base_url in _VOD_BASE_URLS:
+                    url = _vod_master_url(base_url, channel_id, adjusted_time, video_id)
+                    if url in seen:
+                        continue
+                    seen.add(url)
+                    log_debug(f"Candidate master URL (offset {offset}): {url}")
+                    candidates.append(url)
+
+            master_url = _probe_vod_master(candidates)
+
+        if master_url:
+            log_debug(f"SUCCESS: Found valid master playlist URL: {master_url}")
+            _remember_base_url(channel_id, master_url)
 
         if not master_url:
             log_debug("No valid master URL found")
             result['error'] = "No valid master URL found"
             return result
 
-        # Parse the master playlist to get all available qualities
-        m3u8_response = scraper.get(master_url, timeout=15)
-        if m3u8_response.status_code != 200:
-            log_debug(f"Failed to fetch HLS playlist: {m3u8_response.status_code}")
-            # Fallback to direct quality URL construction
-            stream_url = f"{master_url.rsplit('/master.m3u8', 1)[0]}/{quality}/playlist.m3u8"
-            result['url'] = stream_url
-            return result
-
-        m3u8_content = m3u8_response.text
-        streams = parse_m3u8_master_playlist(m3u8_content)
-
-        if not streams:
-            log_debug("No stream variants found in HLS playlist")
-            result['error'] = "No stream variants found in HLS playlist"
-            return result
-
-        log_debug(f"Found {len(streams)} stream variants")
-
-        # Build available qualities list
-        for stream in streams:
-            height = stream.get('height')
-            fps = stream.get('FRAME-RATE', 30)
-            if height:
-                quality_label = f"{height}p{int(fps)}"
-                if quality_label not in result['available_qualities']:
-                    result['available_qualities'].append(quality_label)
-        result['available_qualities'].sort()
-
-        # Select stream based on quality preference
-        selected_stream = select_stream_by_quality(streams, quality)
-
-        if selected_stream:
-            # Construct full URL if the stream URL is relative
-            stream_url = selected_stream['url']
-            if not stream_url.startswith('http'):
-                # Handle relative URLs
-                base_url = master_url.rsplit('/', 1)[0]
-                stream_url = f"{base_url}/{stream_url}"
-
-            result['url'] = stream_url
-
-            # Update selected quality label
-            height = selected_stream.get('height')
-            fps = selected_stream.get('FRAME-RATE', 30)
-            if height:
-                result['quality'] = f"{height}p{int(fps)}"
-
-            log_debug(f"Selected stream: {result['quality']} - {stream_url}")
-        else:
-            result['error'] = "No matching stream found"
-            return result
-
-        return result
+        return _finalize_from_master(scraper, referer, master_url, quality,
+                                     result, ttl=300, vod=True)
 
     except Exception as e:
         log_debug(f"Exception in get_vod_stream_url: {e}")
@@ -528,10 +884,125 @@ def get_video_stream_url(video_url: str, quality: str = "auto") -> dict:
         }
 
 
+def _write_result(result):
+    """
+    Emit the final JSON line on stdout.
+
+    With orjson the serialized bytes go straight to the stdout buffer,
+    skipping the decode to str and print's re-encode.
+    """
+    if orjson is not None:
+        sys.stdout.buffer.write(orjson.dumps(result) + b'\n')
+        sys.stdout.buffer.flush()
+    else:
+        print(json.dumps(result))
+
+
+def _build_result(stream_result):
+    """Shape an internal fetch result into the JSON contract the bot reads."""
+    result = {
+        "url": stream_result['url'],
+        "quality": stream_result['quality'],
+        "available_qualities": stream_result['available_qualities'],
+        "success": stream_result['url'] is not None
+    }
+
+    if not stream_result['url'] and stream_result['error']:
+        result["error"] = stream_result['error']
+
+    return result
+
+
+# Default Unix socket path for --serve mode
+_DEFAULT_SOCKET = os.path.join(
+    os.environ.get('XDG_RUNTIME_DIR', '/tmp'), 'streambot-kick.sock'
+)
+
+
+def _handle_client(conn):
+    """Answer one JSON request line on a daemon connection."""
+    try:
+        with conn, conn.makefile('rwb') as stream:
+            line = stream.readline()
+            if not line:
+                return
+            request = _loads(line)
+            stream_result = get_video_stream_url(
+                request.get('url', ''), request.get('quality', 'auto')
+            )
+            stream.write((_dumps(_build_result(stream_result)) + '\n').encode())
+            stream.flush()
+    except Exception as e:
+        log_debug(f"Client handling failed: {e}")
+
+
+def serve(socket_path):
+    """
+    Run as a long-lived daemon on a Unix socket instead of one-shot CLI.
+
+    Each connection sends a single JSON request line like
+    {"url": "https://kick.com/...", "quality": "auto"} and receives one
+    JSON response line in the same shape as the CLI output. Keeping the
+    process alive preserves the scraper session, Cloudflare clearance and
+    connection pools across requests, so only the first request pays the
+    challenge-solving cost.
+    """
+    try:
+        os.unlink(socket_path)
+    except FileNotFoundError:
+        pass
+
+    server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    server.bind(socket_path)
+    server.listen(8)
+    log_debug(f"Serving on {socket_path}")
+
+    _prewarm_connections()
+    try:
+        while True:
+            conn, _ = server.accept()
+            threading.Thread(target=_handle_client, args=(conn,), daemon=True).start()
+    finally:
+        server.close()
+
+
+def _try_daemon(video_url, quality):
+    """
+    Forward a request to a running --serve daemon, if one is listening.
+
+    Returns the daemon's result dict, or None when no daemon is available
+    (no socket, connection refused, malformed response) so the caller
+    falls back to the in-process fetch.
+    """
+    if not hasattr(socket, 'AF_UNIX') or not os.path.exists(_DEFAULT_SOCKET):
+        return None
+    try:
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as client:
+            client.settimeout(30)
+            client.connect(_DEFAULT_SOCKET)
+            client.sendall(_dumps({'url': video_url, 'quality': quality}).encode() + b'\n')
+            with client.makefile('rb') as stream:
+                line = stream.readline()
+        if not line:
+            return None
+        log_debug("Request answered by daemon")
+        return _loads(line)
+    except (OSError, ValueError) as e:
+        log_debug(f"Daemon not reachable, running in-process: {e}")
+        return None
+
+
 def main():
     """
     Main entry point for CLI usage.
     """
+    if '--serve' in sys.argv:
+        index = sys.argv.index('--serve')
+        has_path = len(sys.argv) > index + 1 and not sys.argv[index + 1].startswith('--')
+        socket_path = sys.argv[index + 1] if has_path else _DEFAULT_SOCKET
+        serve(socket_path)
+        return 0
+
     if len(sys.argv) < 2:
         result = {
             "success": False,
@@ -540,7 +1011,7 @@ def main():
             "quality": None,
             "available_qualities": []
         }
-        print(json.dumps(result))
+        _write_result(result)
         return 1
 
     video_url = sys.argv[1]
@@ -548,19 +1019,17 @@ def main():
 
     log_debug(f"Fetching stream URL for: {video_url} (quality: {quality})")
 
-    stream_result = get_video_stream_url(video_url, quality)
-
-    result = {
-        "url": stream_result['url'],
-        "quality": stream_result['quality'],
-        "available_qualities": stream_result['available_qualities'],
-        "success": stream_result['url'] is not None
-    }
+    # Fast path: a running --serve daemon answers with its warm session;
+    # otherwise fetch in-process as before
+    daemon_result = _try_daemon(video_url, quality)
+    if daemon_result is not None:
+        _write_result(daemon_result)
+        return 0 if daemon_result.get('url') else 1
 
-    if not stream_result['url'] and stream_result['error']:
-        result["error"] = stream_result['error']
+    _prewarm_connections()
+    stream_result = get_video_stream_url(video_url, quality)
 
-    print(json.dumps(result))
+    _write_result(_build_result(stream_result))
     return 0 if stream_result['url'] else 1
 
 